@@ -1,65 +1,80 @@
 import requests
-from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter, Retry
+import random
+import time
+from datetime import datetime, timedelta, timezone
 import os
 from dotenv import load_dotenv
 from supabase import create_client
 
 load_dotenv()
 
+# How long in-process headline results stay valid (seconds)
+HEADLINE_CACHE_TTL = 3600
+
+# Columns the app actually consumes from the headlines table
+HEADLINE_COLUMNS = 'title,source,url,description,published_at,collected_at'
+
 class NewsHandler:
 
-    def __init__(self):
+    def __init__(self, supabase=None):
+        """Initialize the handler.
+
+        Args:
+            supabase: An existing Supabase client to reuse; when omitted a
+                new one is created from the environment
+        """
         # Initialize MediaStack API key
         self.mediastack_api_key = os.getenv("MEDIASTACK_API_KEY")
         if not self.mediastack_api_key:
             raise ValueError("MEDIASTACK_API_KEY must be set in your .env file")
             
-        # Initialize Supabase client
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in your .env file")
-            
-        self.supabase = create_client(supabase_url, supabase_key)
-    
+        # Initialize Supabase client unless one was injected
+        if supabase is None:
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_KEY")
+
+            if not supabase_url or not supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in your .env file")
+
+            supabase = create_client(supabase_url, supabase_key)
+
+        self.supabase = supabase
+
+        # In-process cache: (query, count) -> (monotonic timestamp, headlines)
+        self._headline_cache = {}
+
+        # Persistent HTTP session so repeated MediaStack calls reuse the same
+        # TCP/TLS connection instead of handshaking every time
+        self._http = requests.Session()
+        self._http.mount("http://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
+
     def get_top_headlines(self, query="AI", count=10, save_to_db=True, max_age_hours=24):
         """Fetch top headlines and optionally save them to Supabase.
-        First checks if recent headlines exist in Supabase before calling the API.
+        First checks the in-process cache, then Supabase, before calling the API.
         """
         try:
-            # Check if we have recent headlines in Supabase first
-            stored_headlines = self.fetch_stored_headlines(query=query, limit=count)
-            
-            # Check if headlines are recent enough
-            current_time = datetime.now(timezone.utc)
-            recent_headlines = []
-            
-            for headline in stored_headlines:
-                try:
-                    # Parse the timestamp from collected_at field
-                    if 'collected_at' in headline:
-                        # If collected_at is already a datetime object
-                        if isinstance(headline['collected_at'], datetime):
-                            headline_time = headline['collected_at']
-                            if headline_time.tzinfo is None:
-                                # Add timezone if naive
-                                headline_time = headline_time.replace(tzinfo=timezone.utc)
-                        # If it's a string, parse it
-                        else:
-                            headline_time = datetime.fromisoformat(headline['collected_at'].replace('Z', '+00:00'))
-                        
-                        age_hours = (current_time - headline_time).total_seconds() / 3600
-                        
-                        if age_hours <= max_age_hours:
-                            recent_headlines.append(headline)
-                except (ValueError, KeyError) as e:
-                    print(f"Error parsing timestamp for headline: {e}")
-                    continue
+            # Serve repeated requests for the same (query, count) from memory
+            # instead of hitting Supabase on every Streamlit rerun
+            cache_key = (query, count)
+            cached = self._headline_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < HEADLINE_CACHE_TTL:
+                return cached[1]
+            # Check if we have recent headlines in Supabase first; the
+            # freshness filter runs server-side so stale rows never leave
+            # the database
+            recent_headlines = self.fetch_stored_headlines(
+                query=query, limit=count, max_age_hours=max_age_hours
+            )
             
             # If we have enough recent stored headlines, return those
             if len(recent_headlines) >= count:
                 print(f"Using {len(recent_headlines)} cached headlines from Supabase (less than {max_age_hours} hours old)")
+                self._headline_cache[cache_key] = (time.monotonic(), recent_headlines)
                 return recent_headlines
             
             # Otherwise, fetch new headlines from MediaStack API
@@ -77,30 +92,22 @@ class NewsHandler:
                 "sort": "published_desc"  # Get the most recent news first
             }
             
-            # Make the API request
-            response = requests.get(url, params=params)
+            # Make the API request over the shared keep-alive session
+            response = self._http.get(url, params=params, timeout=5)
             response.raise_for_status()  # Raise an exception for HTTP errors
             
             # Parse the response
             data = response.json()
             
             if 'data' in data and data['data']:
-                articles = []
-                
-                for item in data['data']:
-                    article = {
-                        'title': item.get('title', ''),
-                        'source': item.get('source', ''),
-                        'url': item.get('url', ''),
-                        'description': item.get('description', ''),
-                        'published_at': item.get('published_at', '')
-                    }
-                    
-                    articles.append(article)
-                
+                # Build all article dicts in one comprehension
+                keys = ('title', 'source', 'url', 'description', 'published_at')
+                articles = [{k: item.get(k, '') for k in keys} for item in data['data']]
+
                 if save_to_db and articles:
                     self._save_headlines_to_supabase(articles, query)
-                
+
+                self._headline_cache[cache_key] = (time.monotonic(), articles)
                 return articles
             else:
                 print("No data returned from MediaStack API")
@@ -111,51 +118,65 @@ class NewsHandler:
             return []
     
     def _save_headlines_to_supabase(self, articles, query):
-        """Save headlines to Supabase."""
+        """Save headlines to Supabase in a single bulk insert."""
         current_time = datetime.now(timezone.utc).isoformat()
+
+        rows = [{
+            'title': article['title'],
+            'query': query,
+            'source': article['source'],
+            'url': article['url'],
+            'description': article.get('description', ''),
+            'published_at': article['published_at'],
+            'collected_at': current_time
+        } for article in articles]
+
+        try:
+            self.supabase.table('headlines').insert(rows).execute()
+        except Exception as e:
+            print(f"Error saving headlines to Supabase: {str(e)}")
         
-        for article in articles:
-            try:
-                self.supabase.table('headlines').insert({
-                    'title': article['title'],
-                    'query': query,
-                    'source': article['source'],
-                    'url': article['url'],
-                    'description': article.get('description', ''),
-                    'published_at': article['published_at'],
-                    'collected_at': current_time
-                }).execute()
-            except Exception as e:
-                print(f"Error saving headline to Supabase: {str(e)}")
-        
-    def fetch_stored_headlines(self, query=None, limit=10):
-        """Fetch headlines from Supabase."""
+    def fetch_stored_headlines(self, query=None, limit=10, max_age_hours=None, columns=HEADLINE_COLUMNS):
+        """Fetch headlines from Supabase, newest first.
+
+        When max_age_hours is given, the freshness predicate is pushed into
+        the query so Supabase filters on its index instead of shipping stale
+        rows to the client. Only the requested columns cross the wire.
+        """
         try:
+            request = self.supabase.table('headlines').select(columns)
+
             if query:
-                response = self.supabase.table('headlines').select('*').eq('query', query).limit(limit).execute()
-            else:
-                response = self.supabase.table('headlines').select('*').limit(limit).execute()
-            
+                request = request.eq('query', query)
+
+            if max_age_hours is not None:
+                cutoff = (datetime.now(timezone.utc) - timedelta(hours=max_age_hours)).isoformat()
+                request = request.gte('collected_at', cutoff)
+
+            response = request.order('collected_at', desc=True).limit(limit).execute()
             return response.data
         except Exception as e:
             print(f"Error fetching stored headlines: {str(e)}")
             return []
     
-    def get_news_context(self, query="AI", count=10, include_description=True):
+    def get_news_context(self, query="AI", count=3, include_description=True, articles=None):
         """
         Get news headlines and details formatted as context for LLMs.
-        
+
         Args:
             query: The search query for headlines
-            count: Number of headlines to return
+            count: Number of headlines to fetch (only one is used in the context,
+                so keep this small)
             include_description: Whether to include the article description
+            articles: Pre-fetched headlines to format, skipping the fetch
             
         Returns:
             String: Formatted context for LLM consumption
         """
         try:
-            # Fetch headlines first (using cached if available)
-            articles = self.get_top_headlines(query=query, count=count)
+            # Fetch headlines unless the caller already has them
+            if articles is None:
+                articles = self.get_top_headlines(query=query, count=count)
             
             if not articles:
                 return f"I couldn't find any recent news about {query}."
@@ -164,7 +185,6 @@ class NewsHandler:
             context = f"Recent News Headlines about {query}:\n\n"
             
             # Select a random article from the available ones
-            import random
             if articles:
                 random_article = random.choice(articles)
                 
@@ -0,0 +1,16 @@
+-- Keeps wiki_facts bounded per topic. Called by WikiFetcher after each bulk
+-- upsert; everything older than the newest p_keep rows for the topic is
+-- deleted so reads stay small as the table ages.
+CREATE OR REPLACE FUNCTION prune_wiki_facts(p_topic text, p_keep int)
+RETURNS void
+LANGUAGE sql
+AS $$
+    DELETE FROM wiki_facts
+    WHERE topic = p_topic
+      AND id NOT IN (
+          SELECT id FROM wiki_facts
+          WHERE topic = p_topic
+          ORDER BY collected_at DESC
+          LIMIT p_keep
+      );
+$$;
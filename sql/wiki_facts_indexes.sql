@@ -0,0 +1,28 @@
+-- Indexes backing WikiFetcher's hot Supabase query:
+--   WHERE topic = ? AND collected_at >= ? ORDER BY collected_at DESC LIMIT n
+-- The composite B-tree turns that lookup into an index scan instead of a
+-- sequential scan that grows with table size.
+CREATE INDEX IF NOT EXISTS wiki_facts_topic_time_idx
+    ON wiki_facts (topic, collected_at DESC);
+
+-- Backs the (topic, content_md5) conflict target used by the bulk upsert in
+-- _save_facts_to_supabase. The hash lives in its own column (written by the
+-- app) rather than an md5(content) expression, because Postgres can only
+-- infer an ON CONFLICT arbiter from a unique index on plain columns; hashing
+-- also keeps long paragraphs within the B-tree row-size limit.
+ALTER TABLE wiki_facts ADD COLUMN IF NOT EXISTS content_md5 text;
+UPDATE wiki_facts SET content_md5 = md5(content) WHERE content_md5 IS NULL;
+
+-- The pre-upsert insert path wrote the same paragraphs again on every
+-- cache-expiry refetch, so existing tables hold duplicates that would make
+-- the unique-index creation abort. Keep only the newest copy of each
+-- (topic, content_md5) pair before enforcing uniqueness.
+DELETE FROM wiki_facts a
+    USING wiki_facts b
+    WHERE a.topic = b.topic
+      AND a.content_md5 = b.content_md5
+      AND (a.collected_at < b.collected_at
+           OR (a.collected_at = b.collected_at AND a.id < b.id));
+
+CREATE UNIQUE INDEX IF NOT EXISTS wiki_facts_topic_content_uniq
+    ON wiki_facts (topic, content_md5);
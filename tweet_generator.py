@@ -1,140 +1,517 @@
 import os
+import time
+import string
+import hashlib
+import asyncio
+import functools
+import concurrent.futures
+import httpx
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.callbacks.manager import CallbackManager
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 
+# The semantic cache needs the embedding stack; degrade to exact-match-only
+# caching if it is not installed
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# Disk-backed cache tier: in-process caches die on redeploy, but the
+# scheduler reuses the same topics overnight, so a persistent tier keeps
+# those hits warm across restarts. Optional — degrade to memory-only
+try:
+    import diskcache
+    _disk_cache = diskcache.Cache("/tmp/tweet_cache")
+except Exception:
+    _disk_cache = None
+
 load_dotenv()
 
+# Groq model tiers: tweets are short outputs, so the 8B instant model covers
+# the interactive path at roughly half the latency of the 70B model, which
+# stays available for document-grounded tweets
+SPEED_MAP = {
+    "instant": "llama-3.1-8b-instant",
+    "balanced": "llama-3.3-70b-versatile",
+}
+
+# One keep-alive HTTP client shared by every ChatGroq instance, so repeated
+# calls reuse the pooled TLS connection instead of re-handshaking
+_HTTP = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+    timeout=httpx.Timeout(30.0, connect=5.0)
+)
+
+# Upper bound on exact-match response cache entries; oldest are evicted
+_RESPONSE_CACHE_MAX = 256
+
+# TTL caches for fetched contexts, keyed by topic. News goes stale faster
+# than Wikipedia, so it gets a shorter lifetime
+_NEWS_CONTEXT_TTL = 300
+_WIKI_CONTEXT_TTL = 3600
+_news_context_cache = {}
+_wiki_context_cache = {}
+
+# Precomputed translation table for topic normalization: cheaper than a
+# regex sub and run once per cache lookup on the hot path
+_PUNCT_TBL = str.maketrans("", "", string.punctuation)
+
+
+def _norm(topic):
+    """Normalize a topic for cache keys ("AI!" and "ai" share an entry)."""
+    return topic.lower().strip().translate(_PUNCT_TBL)
+
+# Shared human-message template: the static instructions lead, the dynamic
+# topic and contexts trail, and absent contexts collapse to nothing
+HUMAN_TEMPLATE = (
+    "Create an engaging tweet about the topic below.\n"
+    "Make it sound natural and include 1-3 relevant hashtags.\n"
+    "Keep it under 280 characters. Only return the tweet text.\n"
+    "\nTopic: {topic}{news}{wiki}\n"
+)
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for near-duplicate generation requests.
+
+    Exact caching misses topics that differ only in phrasing ("AI" vs
+    "Artificial Intelligence"); embedding the request and matching on cosine
+    similarity above a high threshold catches those and returns the cached
+    tweet without a Groq round-trip.
+    """
+
+    def __init__(self, threshold=0.92, max_entries=1000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._model = None
+        self._embeddings = None  # (N, 384) array of normalized request vectors
+        self._tweets = []
+
+    def _embed(self, text):
+        """Embed and L2-normalize a request string, loading the model lazily."""
+        if self._model is None:
+            self._model = SentenceTransformer(
+                "sentence-transformers/all-MiniLM-L6-v2",
+                cache_folder="./model_cache"
+            )
+        vector = self._model.encode([text], show_progress_bar=False)[0]
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, text):
+        """Return the cached tweet for the most similar request, if close enough."""
+        try:
+            if not self._tweets:
+                return None
+
+            query = self._embed(text)
+
+            # One batched dot product against all stored vectors
+            scores = self._embeddings @ query
+            best = int(np.argmax(scores))
+
+            if scores[best] >= self.threshold:
+                return self._tweets[best]
+            return None
+        except Exception as e:
+            print(f"Error reading semantic cache: {str(e)}")
+            return None
+
+    def add(self, text, tweet):
+        """Store a generated tweet, evicting the oldest entry when full."""
+        try:
+            vector = self._embed(text)[None, :]
+
+            if self._embeddings is None:
+                self._embeddings = vector
+            else:
+                self._embeddings = np.vstack([self._embeddings, vector])
+            self._tweets.append(tweet)
+
+            if len(self._tweets) > self.max_entries:
+                self._embeddings = self._embeddings[1:]
+                self._tweets.pop(0)
+        except Exception as e:
+            print(f"Error writing semantic cache: {str(e)}")
+
+def _build_messages(system_message, human_message):
+    """Build the LangChain message pair without Pydantic validation.
+
+    model_construct skips field validation, which is pure overhead here: both
+    contents are strings we just built ourselves. Saves a couple of Pydantic
+    validate passes per generation, which adds up in bulk batches.
+    """
+    return [
+        SystemMessage.model_construct(content=system_message),
+        HumanMessage.model_construct(content=human_message),
+    ]
+
+
+def _error_tweet(topic):
+    """Fallback text returned when generation fails; callers must not cache it."""
+    return f"Unable to generate tweet about {topic}. Please try again."
+
+
+def _truncate(tweet, limit=280):
+    """Clamp a tweet to the Twitter character limit in a single slice."""
+    return tweet if len(tweet) <= limit else tweet[:limit - 3] + "..."
+
+
+@functools.lru_cache(maxsize=8)
+def _style_system_message(tweet_style):
+    """Build (once per style) the system message for document tweets."""
+    return (
+        f"Expert tweet writer. Style: {tweet_style.lower()}. "
+        "Keep tweets under 280 characters with 1-2 relevant hashtags. Return only the tweet text."
+    )
+
+
 class TweetGenerator:
-    def __init__(self):
-        """Initialize the TweetGenerator with ChatGroq LLM."""
+    # Shared system prompt for topic/context tweets, built once
+    SYSTEM_MESSAGE = "Expert tweet writer. Keep tweets under 280 characters with relevant hashtags. Return only the tweet text."
+
+    # Recognized document tweet styles
+    TWEET_STYLES = ("Informative", "Engaging", "Professional", "Conversational")
+
+    def __init__(self, tier="instant"):
+        """Initialize the TweetGenerator with ChatGroq LLM.
+
+        Args:
+            tier: Default model tier from SPEED_MAP ("instant" or "balanced")
+        """
         # Get API key from environment variables
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         if not self.groq_api_key:
             raise ValueError("GROQ_API_KEY must be set in your .env file")
-        
-        # Initialize ChatGroq
-        callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
-        self.groq = ChatGroq(
-            groq_api_key=self.groq_api_key,
-            model_name="llama3-70b-8192",  # You can change this to your preferred model
-            temperature=0.7,
-            callback_manager=callback_manager,
-            streaming=False
-        )
-    
-    def generate_tweet(self, topic, news_context=None, wiki_context=None):
+
+        self.tier = tier
+        self._callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
+
+        # ChatGroq clients are created lazily per tier
+        self._llms = {}
+
+        # Exact-match response cache: Streamlit reruns re-invoke generation
+        # with identical prompts, and a hit skips the Groq round-trip entirely
+        self._response_cache = {}
+
+        # Semantic cache catches rephrasings the exact cache misses
+        self._semantic_cache = SemanticCache() if SEMANTIC_CACHE_AVAILABLE else None
+
+    def _get_llm(self, tier):
+        """Get the ChatGroq client for a model tier, creating it on first use."""
+        if tier not in self._llms:
+            self._llms[tier] = ChatGroq(
+                groq_api_key=self.groq_api_key,
+                model_name=SPEED_MAP.get(tier, SPEED_MAP["instant"]),
+                temperature=0.7,
+                max_tokens=120,  # tweets are <=280 chars, roughly 90 tokens
+                callback_manager=self._callback_manager,
+                streaming=False,
+                http_client=_HTTP
+            )
+        return self._llms[tier]
+
+    def _store_response(self, key, tweet):
+        """Store in the exact-match cache, evicting oldest entries past the cap."""
+        while len(self._response_cache) >= _RESPONSE_CACHE_MAX:
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache[key] = tweet
+
+    def _invoke_cached(self, system_message, human_message, tier=None, use_cache=True):
+        """Send messages to ChatGroq, caching responses by exact prompt match.
+
+        use_cache=False skips both the cache read and write: callers like the
+        recurring scheduler need a fresh temperature-0.7 sample per run, not
+        a replay of the previous tweet.
+        """
+        tier = tier or self.tier
+        key = hashlib.blake2b(
+            (tier + "\x00" + system_message + "\x00" + human_message).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        if use_cache:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                return cached
+
+            if _disk_cache is not None:
+                cached = _disk_cache.get(key)
+                if cached is not None:
+                    self._store_response(key, cached)
+                    return cached
+
+        messages = _build_messages(system_message, human_message)
+
+        response = self._get_llm(tier).invoke(messages)
+        tweet = response.content.strip()
+
+        if use_cache:
+            self._store_response(key, tweet)
+            if _disk_cache is not None:
+                _disk_cache.set(key, tweet, expire=86400)
+        return tweet
+
+    def _build_prompt(self, topic, news_context=None, wiki_context=None):
+        """Build the (system_message, human_message) pair for a tweet request."""
+        # One template for every mode: the static instruction prefix is
+        # identical across requests (better prefix caching), and the optional
+        # context sections collapse to empty strings when absent
+        news = f"\n\nRecent news on the topic:\n{news_context}" if news_context else ""
+        wiki = f"\n\nInteresting facts:\n{wiki_context}" if wiki_context else ""
+
+        human_message = HUMAN_TEMPLATE.format(topic=topic, news=news, wiki=wiki)
+        return self.SYSTEM_MESSAGE, human_message
+
+    def generate_tweet(self, topic, news_context=None, wiki_context=None, use_cache=True):
         """
         Generate a tweet based on the provided topic and optional contexts.
-        
+
         Args:
             topic: The main topic for the tweet
             news_context: Optional context from news articles
             wiki_context: Optional context from Wikipedia
-            
+            use_cache: When False, bypass the response caches and always
+                sample a fresh tweet
+
         Returns:
             String: The generated tweet
         """
-        system_message = """You are a professional social media manager who specializes in creating 
-        engaging tweets that get high engagement. Your tweets are informative, relevant, and 
-        include appropriate hashtags. Keep tweets under 280 characters."""
-        
-        # Build the human message based on available contexts
-        if news_context and wiki_context:
-            # Both news and wiki contexts available
-            human_message = f"""Create an engaging tweet about {topic} that combines recent news with 
-            interesting facts. The tweet should be informative yet conversational.
-            
-            Here's some recent news on the topic:
-            {news_context}
-            
-            Here are some interesting facts:
-            {wiki_context}
-            
-            Make the tweet sound natural and include 1-3 relevant hashtags. 
-            Keep it under 280 characters. Only return the tweet text.
-            """
-        elif news_context:
-            # Only news context available
-            human_message = f"""Create an engaging tweet about {topic} based on recent news.
-            
-            Here's some recent news on the topic:
-            {news_context}
-            
-            Make the tweet sound informative and timely. Include 1-2 relevant hashtags.
-            Keep it under 280 characters. Only return the tweet text.
-            """
-        elif wiki_context:
-            # Only wiki context available
-            human_message = f"""Create an engaging tweet about {topic} that shares an interesting fact.
-            
-            Here are some facts about the topic:
-            {wiki_context}
-            
-            Make the tweet sound interesting and educational. Include 1-2 relevant hashtags.
-            Keep it under 280 characters. Only return the tweet text.
-            """
-        else:
-            # No context, default mode
-            human_message = f"""Create an engaging tweet about {topic}.
-            
-            Your tweet should be conversational, interesting, and include 1-2 relevant hashtags.
-            Keep it under 280 characters. Only return the tweet text.
-            """
-        
+        system_message, human_message = self._build_prompt(topic, news_context, wiki_context)
+
         # Send messages to ChatGroq
         try:
-            messages = [
-                SystemMessage(content=system_message),
-                HumanMessage(content=human_message)
-            ]
-            
-            response = self.groq.invoke(messages)
-            tweet = response.content.strip()
-            
-            # Ensure tweet is within character limit
-            if len(tweet) > 280:
-                tweet = tweet[:277] + "..."
-                
+            tweet = _truncate(self._invoke_cached(system_message, human_message, use_cache=use_cache))
+
             return tweet
-        
+
         except Exception as e:
             print(f"Error generating tweet: {str(e)}")
-            return f"Unable to generate tweet about {topic}. Please try again."
+            return _error_tweet(topic)
 
-    def generate_tweet_with_contexts(self, topic, include_news=False, include_wiki=False, 
-                                    news_handler=None, wiki_fetcher=None):
+    def stream_tweet(self, topic, news_context=None, wiki_context=None, tier=None):
         """
-        Convenience method that fetches contexts and generates a tweet.
+        Stream a tweet chunk-by-chunk as it arrives from Groq.
+
+        A cached response is yielded in one piece. On a miss, chunks are
+        yielded as they arrive and consumption stops once the 280-char limit
+        is reached; the final text lands in the exact-match cache. Mid-stream
+        failures are raised rather than yielded, so callers never mistake a
+        half-streamed tweet plus an error message for finished output.
+        """
+        system_message, human_message = self._build_prompt(topic, news_context, wiki_context)
+        tier = tier or self.tier
+
+        key = hashlib.blake2b(
+            (tier + "\x00" + system_message + "\x00" + human_message).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        cached = self._response_cache.get(key)
+        if cached is None and _disk_cache is not None:
+            cached = _disk_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = _build_messages(system_message, human_message)
+
+        buffer = ""
+        try:
+            for chunk in self._get_llm(tier).stream(messages):
+                text = chunk.content
+                if not text:
+                    continue
+
+                buffer += text
+                yield text
+
+                # Stop consuming tokens once the model overshoots the limit
+                if len(buffer) > 280:
+                    break
+        except Exception as e:
+            print(f"Error streaming tweet: {str(e)}")
+            raise
+
+        tweet = _truncate(buffer.strip())
+        self._store_response(key, tweet)
+        if _disk_cache is not None:
+            _disk_cache.set(key, tweet, expire=86400)
+
+    def _fetch_contexts(self, topic, include_news=False, include_wiki=False,
+                        news_handler=None, wiki_fetcher=None,
+                        news_articles=None, wiki_facts=None):
+        """Fetch the requested news/wiki contexts concurrently, with TTL caching.
+
+        Callers that already hold the headline/fact lists pass them in, so
+        formatting the context costs no extra fetch.
         """
-        if not topic:
-            return "Please provide a topic to tweet about."
-        
         news_context = None
         wiki_context = None
-        
-        # Fetch news context if requested
+        topic_key = _norm(topic)
+        now = time.monotonic()
+
+        # Serve recent contexts for the same topic straight from memory
         if include_news and news_handler:
-            try:
-                news_context = news_handler.get_news_context(query=topic, count=3)
-            except Exception as e:
-                print(f"Error fetching news context: {str(e)}")
-                news_context = f"Unable to retrieve news about {topic}."
-        
-        # Fetch wiki context if requested
+            cached = _news_context_cache.get(topic_key)
+            if cached and now - cached[0] < _NEWS_CONTEXT_TTL:
+                news_context = cached[1]
+            elif _disk_cache is not None:
+                news_context = _disk_cache.get(("news", topic_key))
+
         if include_wiki and wiki_fetcher:
-            try:
-                wiki_context = wiki_fetcher.get_wiki_context(query=topic, count=2)
-            except Exception as e:
-                print(f"Error fetching wiki context: {str(e)}")
-                wiki_context = f"Unable to retrieve Wikipedia information about {topic}."
-        
+            cached = _wiki_context_cache.get(topic_key)
+            if cached and now - cached[0] < _WIKI_CONTEXT_TTL:
+                wiki_context = cached[1]
+            elif _disk_cache is not None:
+                wiki_context = _disk_cache.get(("wiki", topic_key))
+
+        # Fetch whatever is still missing concurrently — they are independent
+        # network calls, so the wait is max() of the two instead of their sum
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            news_future = None
+            wiki_future = None
+
+            if include_news and news_handler and news_context is None:
+                news_future = executor.submit(
+                    news_handler.get_news_context, query=topic, count=3, articles=news_articles
+                )
+
+            if include_wiki and wiki_fetcher and wiki_context is None:
+                wiki_future = executor.submit(
+                    wiki_fetcher.get_wiki_context, query=topic, count=2, facts=wiki_facts
+                )
+
+            if news_future:
+                try:
+                    news_context = news_future.result(timeout=10)
+                    _news_context_cache[topic_key] = (time.monotonic(), news_context)
+                    if _disk_cache is not None:
+                        _disk_cache.set(("news", topic_key), news_context, expire=_NEWS_CONTEXT_TTL)
+                except Exception as e:
+                    print(f"Error fetching news context: {str(e)}")
+                    news_context = f"Unable to retrieve news about {topic}."
+
+            if wiki_future:
+                try:
+                    wiki_context = wiki_future.result(timeout=10)
+                    _wiki_context_cache[topic_key] = (time.monotonic(), wiki_context)
+                    if _disk_cache is not None:
+                        _disk_cache.set(("wiki", topic_key), wiki_context, expire=_WIKI_CONTEXT_TTL)
+                except Exception as e:
+                    print(f"Error fetching wiki context: {str(e)}")
+                    wiki_context = f"Unable to retrieve Wikipedia information about {topic}."
+
+        return news_context, wiki_context
+
+    def generate_tweet_with_contexts(self, topic, include_news=False, include_wiki=False,
+                                    news_handler=None, wiki_fetcher=None,
+                                    news_articles=None, wiki_facts=None,
+                                    use_cache=True):
+        """
+        Convenience method that fetches contexts and generates a tweet.
+
+        use_cache=False skips the exact and semantic response caches (context
+        fetches still use theirs); the recurring scheduler sets it so every
+        interval posts a fresh tweet instead of a duplicate Twitter rejects.
+        """
+        if not topic:
+            return "Please provide a topic to tweet about."
+
+        news_context, wiki_context = self._fetch_contexts(
+            topic, include_news, include_wiki, news_handler, wiki_fetcher,
+            news_articles=news_articles, wiki_facts=wiki_facts
+        )
+
+        # Near-duplicate requests hit the semantic cache and skip the LLM call
+        cache_text = _norm(topic) + "\n" + (news_context or "") + (wiki_context or "")
+        if use_cache and self._semantic_cache:
+            cached = self._semantic_cache.get(cache_text)
+            if cached is not None:
+                return cached
+
         # Generate the tweet
-        return self.generate_tweet(topic, news_context, wiki_context)
+        tweet = self.generate_tweet(topic, news_context, wiki_context, use_cache=use_cache)
+
+        # Cache only confirmed successes: the semantic cache has no TTL and a
+        # retry matches its own failure text at similarity 1.0, so one
+        # transient Groq error would otherwise pin the fallback message as
+        # the cached "tweet" for this topic
+        if use_cache and self._semantic_cache and tweet != _error_tweet(topic):
+            self._semantic_cache.add(cache_text, tweet)
+
+        return tweet
+
+    def stream_tweet_with_contexts(self, topic, include_news=False, include_wiki=False,
+                                   news_handler=None, wiki_fetcher=None,
+                                   news_articles=None, wiki_facts=None):
+        """
+        Streaming variant of generate_tweet_with_contexts for the UI.
+        """
+        if not topic:
+            yield "Please provide a topic to tweet about."
+            return
+
+        news_context, wiki_context = self._fetch_contexts(
+            topic, include_news, include_wiki, news_handler, wiki_fetcher,
+            news_articles=news_articles, wiki_facts=wiki_facts
+        )
 
-    def generate_tweet_with_document(self, topic, document_context, tweet_style="Informative"):
+        # Cached near-duplicates stream back as a single chunk
+        cache_text = _norm(topic) + "\n" + (news_context or "") + (wiki_context or "")
+        if self._semantic_cache:
+            cached = self._semantic_cache.get(cache_text)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        # Stream errors propagate out of this loop, so a failed generation
+        # never reaches the semantic-cache add below
+        for chunk in self.stream_tweet(topic, news_context, wiki_context):
+            chunks.append(chunk)
+            yield chunk
+
+        if self._semantic_cache:
+            self._semantic_cache.add(cache_text, _truncate("".join(chunks).strip()))
+
+    async def generate_tweets_bulk(self, topics):
+        """
+        Generate tweets for several topics concurrently.
+
+        Issues all completions at once via asyncio.gather, bounded by a
+        semaphore so a large batch stays under Groq's rate limits. Wall-clock
+        time is roughly one call's latency instead of one per topic.
+
+        Args:
+            topics: List of topic strings
+
+        Returns:
+            list: Generated tweets, in the same order as topics
+        """
+        semaphore = asyncio.Semaphore(8)
+
+        async def generate_one(topic):
+            system_message, human_message = self._build_prompt(topic)
+            messages = _build_messages(system_message, human_message)
+
+            async with semaphore:
+                try:
+                    response = await self._get_llm(self.tier).ainvoke(messages)
+                    return _truncate(response.content.strip())
+                except Exception as e:
+                    print(f"Error generating tweet for '{topic}': {str(e)}")
+                    return _error_tweet(topic)
+
+        return await asyncio.gather(*[generate_one(topic) for topic in topics])
+
+    def generate_tweet_with_document(self, topic, document_context, tweet_style="Informative",
+                                     use_cache=True):
         """
         Generate a tweet based on document content.
         
@@ -142,54 +519,40 @@ class TweetGenerator:
             topic: The main topic for the tweet
             document_context: Text extracted from the document
             tweet_style: Style of the tweet (Informative, Engaging, Professional, Conversational)
+            use_cache: When False, bypass the response caches and always
+                sample a fresh tweet
             
         Returns:
             String: The generated tweet
         """
-        # Define style-specific tone and characteristics
-        style_instructions = {
-            "Informative": "Focus on facts and information. Be clear and educational. Include specific insights from the document.",
-            "Engaging": "Be attention-grabbing and use compelling language. Ask questions or use strong statements that encourage interaction.",
-            "Professional": "Maintain a formal, business-appropriate tone. Focus on industry relevance and value propositions.",
-            "Conversational": "Use a friendly, casual tone as if speaking directly to a friend. Use more personal language and potentially first-person perspective."
-        }
-        
-        # Get the specific style instruction, defaulting to Informative
-        style_instruction = style_instructions.get(tweet_style, style_instructions["Informative"])
-        
-        system_message = f"""You are a professional social media manager who specializes in creating 
-        engaging tweets that get high engagement. Your tweets are informative, relevant, and 
-        include appropriate hashtags. Keep tweets under 280 characters.
-        
-        For this tweet, use a {tweet_style} style. {style_instruction}"""
-        
-        human_message = f"""Create an engaging tweet about "{topic}" based on the following document content.
-        
-        {document_context}
+        # Encode the style as a single adjective in a compact system prompt,
+        # built once per style and memoized
+        if tweet_style not in self.TWEET_STYLES:
+            tweet_style = "Informative"
+
+        system_message = _style_system_message(tweet_style)
         
-        The tweet should highlight key insights related to "{topic}" from the document excerpts.
+        # Static instructions first, dynamic topic and document content last
+        human_message = f"""Create an engaging tweet based on the document content below.
+        The tweet should highlight key insights related to the topic from the document excerpts.
         Include 1-2 relevant hashtags.
         Keep it under 280 characters. Only return the tweet text.
+
+        Topic: "{topic}"
+
+        {document_context}
         """
         
         try:
-            messages = [
-                SystemMessage(content=system_message),
-                HumanMessage(content=human_message)
-            ]
-            
-            response = self.groq.invoke(messages)
-            tweet = response.content.strip()
-            
-            # Ensure tweet is within character limit
-            if len(tweet) > 280:
-                tweet = tweet[:277] + "..."
-                
+            # Document-grounded tweets get the larger model tier
+            tweet = _truncate(self._invoke_cached(system_message, human_message, tier="balanced",
+                                                   use_cache=use_cache))
+
             return tweet
-        
+
         except Exception as e:
             print(f"Error generating document-based tweet: {str(e)}")
-            return f"Unable to generate tweet about {topic}. Please try again."
+            return _error_tweet(topic)
 
 
 if __name__ == "__main__":
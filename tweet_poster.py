@@ -3,6 +3,7 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 import streamlit as st
 
 class TweetPoster:
@@ -22,10 +23,22 @@ class TweetPoster:
             access_token_secret=os.getenv("TWITTER_ACCESS_SECRET")
         )
         
-        # Initialize the scheduler or get it from session state
+        # Initialize the scheduler or get it from session state. A persistent
+        # jobstore is off the table because the scheduled job closes over the
+        # per-session generator callback, which cannot be serialized; instead
+        # the job defaults keep the in-process scheduler well-behaved over
+        # long runs: missed triggers within an hour still fire once
+        # (misfire_grace_time + coalesce) and runs never pile up
         if 'scheduler' not in st.session_state:
             print("Creating new scheduler")
-            st.session_state.scheduler = BackgroundScheduler()
+            st.session_state.scheduler = BackgroundScheduler(
+                executors={'default': ThreadPoolExecutor(max_workers=4)},
+                job_defaults={
+                    'misfire_grace_time': 3600,
+                    'coalesce': True,
+                    'max_instances': 1
+                }
+            )
             st.session_state.scheduler.start()
         
         self.scheduler = st.session_state.scheduler
@@ -76,11 +89,12 @@ class TweetPoster:
             tuple: (job_id, success_boolean)
         """
         try:
-            # Add a job that will run at the specified interval
+            # Add a job that will run at the specified interval; overlap and
+            # misfire behavior come from the scheduler-level job defaults
             job = self.scheduler.add_job(
                 self._recurring_tweet_job,
                 'interval',
-                hours=0.01,
+                hours=interval_hours,
                 args=[tweet_generator_func, interval_hours]
             )
             
@@ -1,13 +1,19 @@
 import streamlit as st
-import pandas as pd
+import streamlit.components.v1 as components
+import concurrent.futures
+import html
+from dataclasses import dataclass, field
+import os
 from news_handler import NewsHandler
 from wiki_fetcher import WikiFetcher
-import plotly.express as px
 from datetime import datetime, timedelta
 import time
-from tweet_generator import TweetGenerator
+from tweet_generator import TweetGenerator, _truncate
 from tweet_poster import TweetPoster
 from document_handler import DocumentHandler
+from supabase import create_client
+from langchain_community.tools import WikipediaQueryRun
+from langchain_community.utilities import WikipediaAPIWrapper
 
 # Page config and title
 st.set_page_config(
@@ -16,14 +22,27 @@ st.set_page_config(
     layout="wide"
 )
 
+# The network clients are cached on their own so Streamlit's cache layer
+# tracks a couple of small objects instead of walking the handlers' full
+# object graphs on every rerun, and both handlers share one Supabase client
+@st.cache_resource
+def get_supabase():
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+@st.cache_resource
+def get_wikipedia_tool():
+    return WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper(
+        top_k_results=2, doc_content_chars_max=4000
+    ))
+
 # Initialize the news fetcher, wiki fetcher, and tweet generator
 @st.cache_resource
 def get_news_handler():
-    return NewsHandler()
+    return NewsHandler(supabase=get_supabase())
 
 @st.cache_resource  
 def get_wiki_fetcher():
-    return WikiFetcher()
+    return WikiFetcher(supabase=get_supabase(), wiki_tool=get_wikipedia_tool())
 
 @st.cache_resource
 def get_tweet_generator():
@@ -33,17 +52,69 @@ def get_tweet_generator():
 def get_document_handler():
     return DocumentHandler()
 
-news_handler = get_news_handler()
-wiki_fetcher = get_wiki_fetcher()
-tweet_generator = get_tweet_generator()
-document_handler = get_document_handler()
+@st.cache_resource
+def get_tweet_poster():
+    return TweetPoster()
+
+@st.cache_resource
+def get_executor():
+    """One bounded thread pool shared by topic prefetch and page fetches.
+
+    Cached so reruns reuse the same four workers instead of spawning a
+    fresh pool (and fresh threads) on every script execution.
+    """
+    return concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+# Handlers are constructed lazily at their first use (the cache_resource
+# functions above make later calls free), so the initial render isn't blocked
+# on API clients and model loads the default view never touches
+
+# Tweet card markup, built once; call sites only interpolate the tweet body
+_TWEET_HTML = (
+    '<div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; '
+    'border-radius: 12px; padding: 20px; font-family: sans-serif; '
+    'color: #000000;">{}</div>'
+)
+
+def render_tweet_card(tweet_text):
+    '''Render the tweet card with the text HTML-escaped and newlines kept.'''
+    body = html.escape(tweet_text).replace("\n", "<br>")
+    st.markdown(_TWEET_HTML.format(body), unsafe_allow_html=True)
 
 # Sidebar for controls
 st.sidebar.title("Twitter Posting Agent")
 
-# Initialize session state variables
-if 'user_topics' not in st.session_state:
-    st.session_state.user_topics = ["AI"]  # Set a default topic
+# All non-widget state lives on one object so each rerun does a single
+# session-state lookup and plain attribute access after that, instead of a
+# guard-and-default chain of dict lookups. Checkbox state (use_custom_topic,
+# tweet_news, wiki_facts, document_enhanced) stays in st.session_state because
+# the widgets bind those keys directly via key=.
+@dataclass
+class AgentState:
+    user_topics: list = field(default_factory=lambda: ["AI"])  # Default topic
+    show_tweet: bool = False
+    show_news_headlines: bool = False
+    current_tweet: str = ""
+    current_topic: str = ""
+    scheduled_tweet: bool = False
+    include_news: bool = True
+    include_wiki: bool = True
+    scheduling_mode: bool = False
+    hours_to_schedule: int = 2
+    scheduler_active: bool = False
+    next_tweet_time: datetime = None
+    job_id: str = None
+    document_uploaded: bool = False
+    document_id: str = None
+    document_name: str = ""
+    document_chunks: list = field(default_factory=list)
+    prefetched_topic: str = None
+    tweet_cache_key: tuple = None
+
+if 'agent' not in st.session_state:
+    st.session_state.agent = AgentState()
+
+state = st.session_state.agent
 
 if 'use_custom_topic' not in st.session_state:
     st.session_state.use_custom_topic = False
@@ -54,90 +125,42 @@ if 'tweet_news' not in st.session_state:
 if 'wiki_facts' not in st.session_state:
     st.session_state.wiki_facts = False
 
-if 'show_tweet' not in st.session_state:
-    st.session_state.show_tweet = False
-
-if 'show_news_headlines' not in st.session_state:
-    st.session_state.show_news_headlines = False
-
-if 'current_tweet' not in st.session_state:
-    st.session_state.current_tweet = ""
-
-if 'current_topic' not in st.session_state:
-    st.session_state.current_topic = ""
-
-if 'scheduled_tweet' not in st.session_state:
-    st.session_state.scheduled_tweet = False
-
-if 'include_news' not in st.session_state:
-    st.session_state.include_news = True
-
-if 'include_wiki' not in st.session_state:
-    st.session_state.include_wiki = True
-
-if 'scheduling_mode' not in st.session_state:
-    st.session_state.scheduling_mode = False
-
-if 'hours_to_schedule' not in st.session_state:
-    st.session_state.hours_to_schedule = 2
-
-if 'scheduler_active' not in st.session_state:
-    st.session_state.scheduler_active = False
-
-if 'next_tweet_time' not in st.session_state:
-    st.session_state.next_tweet_time = None
-
-if 'job_id' not in st.session_state:
-    st.session_state.job_id = None
-
-if 'document_uploaded' not in st.session_state:
-    st.session_state.document_uploaded = False
-
-if 'document_id' not in st.session_state:
-    st.session_state.document_id = None
-
-if 'document_name' not in st.session_state:
-    st.session_state.document_name = ""
-
-if 'document_chunks' not in st.session_state:
-    st.session_state.document_chunks = []
-
 if 'document_enhanced' not in st.session_state:
     st.session_state.document_enhanced = False
 
 def on_schedule_tweet_click():
-    st.session_state.scheduled_tweet = True
+    state.scheduled_tweet = True
 
 # Define callback function for the "Start Posting Agent" button
 def on_posting_agent_click():
     # Toggle scheduling mode
-    st.session_state.scheduling_mode = True
+    state.scheduling_mode = True
     
     # Don't clear settings here since we want to use the generated tweet
-    if not st.session_state.show_tweet:
+    if not state.show_tweet:
         st.sidebar.error("Please generate a tweet first by clicking 'Show tweet'")
-        st.session_state.scheduling_mode = False
+        state.scheduling_mode = False
         return
     
-    if not st.session_state.current_tweet:
+    if not state.current_tweet:
         st.sidebar.error("No tweet has been generated yet")
-        st.session_state.scheduling_mode = False
+        state.scheduling_mode = False
         return
 
 def on_stop_scheduler_click():
-    if st.session_state.job_id:
+    if state.job_id:
         try:
             # Initialize the tweet poster
-            tweet_poster = TweetPoster()
+            tweet_poster = get_tweet_poster()
             
             # Stop the scheduler
-            success = tweet_poster.stop_scheduler(st.session_state.job_id)
+            success = tweet_poster.stop_scheduler(state.job_id)
             
             if success:
                 st.sidebar.success("Tweet scheduler stopped successfully.")
-                st.session_state.scheduler_active = False
-                st.session_state.next_tweet_time = None
-                st.session_state.job_id = None
+                state.scheduler_active = False
+                state.next_tweet_time = None
+                state.job_id = None
             else:
                 st.sidebar.error("Failed to stop scheduler. Check console for details.")
         except Exception as e:
@@ -145,54 +168,72 @@ def on_stop_scheduler_click():
     else:
         st.sidebar.warning("No active scheduler to stop.")
 
-def format_time_remaining(target_time):
-    """Format the time remaining until target_time in a readable format."""
-    now = datetime.now()
-    time_diff = target_time - now
-    
-    # Handle case where target time is in the past
-    if time_diff.total_seconds() <= 0:
-        return "Due any moment now"
-    
-    # Extract hours, minutes, seconds
-    hours, remainder = divmod(time_diff.seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    
-    # Format
-    if time_diff.days > 0:
-        return f"{time_diff.days}d {hours}h {minutes}m {seconds}s"
-    else:
-        return f"{hours}h {minutes}m {seconds}s"
-    
+def render_countdown(target_time):
+    """Render a countdown to target_time that ticks in the browser.
+
+    The timer updates via setInterval on the client, so repainting the
+    remaining time no longer needs the 10-second meta-refresh that reran
+    the whole script (and every fetch in it) just to redraw one line.
+    """
+    target_ms = int(target_time.timestamp() * 1000)
+    components.html(
+        f"""
+        <div style="font-family: sans-serif; font-size: 14px; color: #31333F;">
+            Next tweet in: <b><span id="cd"></span></b>
+        </div>
+        <script>
+            const target = {target_ms};
+            function tick() {{
+                let s = Math.max(0, Math.floor((target - Date.now()) / 1000));
+                const d = Math.floor(s / 86400); s %= 86400;
+                const h = Math.floor(s / 3600); s %= 3600;
+                const m = Math.floor(s / 60); s %= 60;
+                document.getElementById('cd').innerText =
+                    (d > 0 ? d + 'd ' : '') + h + 'h ' + m + 'm ' + s + 's';
+            }}
+            tick();
+            setInterval(tick, 1000);
+        </script>
+        """,
+        height=30
+    )
+
 # Add a new function for when the scheduler starts
 def on_schedule_start_click():
-    if not st.session_state.current_tweet:
+    if not state.current_tweet:
         st.sidebar.error("No tweet has been generated yet")
         return
     
     try:
-        tweet_poster = TweetPoster()
-        hours_to_schedule = st.session_state.hours_to_schedule
+        tweet_poster = get_tweet_poster()
+        tweet_generator = get_tweet_generator()
+        document_handler = get_document_handler()
+        news_handler = get_news_handler()
+        wiki_fetcher = get_wiki_fetcher()
+        hours_to_schedule = state.hours_to_schedule
         
         # Capture all session state variables we need
-        current_topic = st.session_state.current_topic
+        current_topic = state.current_topic
         document_enhanced = st.session_state.get("document_enhanced", False)
-        document_uploaded = st.session_state.get("document_uploaded", False)
-        document_id = st.session_state.get("document_id", None)
-        include_news = st.session_state.get("include_news", False)
-        include_wiki = st.session_state.get("include_wiki", False)
+        document_uploaded = state.document_uploaded
+        document_id = state.document_id
+        include_news = state.include_news
+        include_wiki = state.include_wiki
         
         # Define a function that will return our tweet text
         def tweet_generator_func():
             # Update the next tweet time when a tweet is posted
             now = datetime.now()
-            st.session_state.next_tweet_time = now + timedelta(hours=hours_to_schedule)
+            state.next_tweet_time = now + timedelta(hours=hours_to_schedule)
             
-            # Use captured variables instead of session state
+            # Use captured variables instead of session state. The response
+            # caches are bypassed here: each interval must sample a fresh
+            # tweet, or Twitter rejects the repeat as a duplicate status
             if document_enhanced and document_uploaded and document_id:
                 return tweet_generator.generate_tweet_with_document(
                     current_topic,
-                    document_handler.get_document_context(document_id)
+                    document_handler.get_document_context(document_id),
+                    use_cache=False
                 )
             else:
                 return tweet_generator.generate_tweet_with_contexts(
@@ -200,7 +241,8 @@ def on_schedule_start_click():
                     include_news=include_news, 
                     include_wiki=include_wiki, 
                     news_handler=news_handler, 
-                    wiki_fetcher=wiki_fetcher
+                    wiki_fetcher=wiki_fetcher,
+                    use_cache=False
                 )
         
         # Schedule recurring tweets with the hours value
@@ -212,18 +254,18 @@ def on_schedule_start_click():
         if success:
             # Set the next tweet time
             now = datetime.now()
-            st.session_state.next_tweet_time = now + timedelta(hours=hours_to_schedule)
+            state.next_tweet_time = now + timedelta(hours=hours_to_schedule)
             
             # Store the job ID for later stopping
-            st.session_state.job_id = job_id
+            state.job_id = job_id
             
             # Update the state to show we have an active scheduler
-            st.session_state.scheduler_active = True
+            state.scheduler_active = True
             
             st.sidebar.success(f"Tweet scheduler started! First tweet will post in {hours_to_schedule} hours, then every {hours_to_schedule} hours after that.")
             
             # Reset scheduling mode after success
-            st.session_state.scheduling_mode = False
+            state.scheduling_mode = False
         else:
             st.sidebar.error("Failed to schedule tweets. Check console for details.")
     except Exception as e:
@@ -231,20 +273,20 @@ def on_schedule_start_click():
 
 def on_tweet_post_click():
     # Don't clear settings here since we want to use the generated tweet
-    if not st.session_state.show_tweet:
+    if not state.show_tweet:
         st.sidebar.error("Please generate a tweet first by clicking 'Show tweet'")
         return
     
-    if not st.session_state.current_tweet:
+    if not state.current_tweet:
         st.sidebar.error("No tweet has been generated yet")
         return
     
     try:
         # Initialize the tweet poster
-        tweet_poster = TweetPoster()
+        tweet_poster = get_tweet_poster()
         
         # Post the tweet stored in session state
-        success = tweet_poster.post_tweet_manually(st.session_state.current_tweet)
+        success = tweet_poster.post_tweet_manually(state.current_tweet)
         
         if success:
             st.sidebar.success("Tweet posted successfully!")
@@ -254,19 +296,22 @@ def on_tweet_post_click():
         st.sidebar.error(f"Error posting tweet: {str(e)}")
 
 def on_show_tweet_click():
-    st.session_state.show_tweet = True
-    if st.session_state.user_topics == []:
+    state.show_tweet = True
+    if state.user_topics == []:
         st.sidebar.error("Please select a topic first")
         return
     else:
         st.sidebar.success("Tweet shown")
 
 def on_show_news_headlines_click():
-    st.session_state.show_news_headlines = True
-
-def display_detailed_news(topic, count=5):
-    with st.spinner(f"Fetching news about {topic}..."):
-        articles = news_handler.get_top_headlines(query=topic, count=count)
+    state.show_news_headlines = True
+
+def display_detailed_news(topic, count=5, articles=None):
+    # Callers that already fetched headlines pass them in so the expander
+    # does not repeat the network call
+    if articles is None:
+        with st.spinner(f"Fetching news about {topic}..."):
+            articles = get_news_handler().get_top_headlines(query=topic, count=count)
     
     if articles:
         st.subheader(f"📰 Top Headlines about {topic}")
@@ -295,9 +340,31 @@ def display_detailed_news(topic, count=5):
     else:
         st.warning(f"No headlines found for '{topic}'")
 
-def display_wiki_facts(topic, count=3, use_expanders=True):
-    with st.spinner(f"Fetching Wikipedia facts about {topic}..."):
-        facts = wiki_fetcher.get_wiki_facts(query=topic, count=count)
+def render_streaming_tweet(stream, topic):
+    """Render tweet tokens as they arrive and return the final tweet text.
+
+    If the stream fails partway, the partial text is discarded and a clean
+    fallback message is returned instead of half a tweet with an error
+    appended.
+    """
+    placeholder = st.empty()
+    text = ""
+    try:
+        for chunk in stream:
+            text += chunk
+            placeholder.markdown(text + "▌")
+    except Exception as e:
+        print(f"Error streaming tweet: {str(e)}")
+        placeholder.empty()
+        return f"Unable to generate tweet about {topic}. Please try again."
+    placeholder.empty()
+
+    return _truncate(text.strip())
+
+def display_wiki_facts(topic, count=3, use_expanders=True, facts=None):
+    if facts is None:
+        with st.spinner(f"Fetching Wikipedia facts about {topic}..."):
+            facts = get_wiki_fetcher().get_wiki_facts(query=topic, count=count)
     
     if facts:
         st.subheader(f"📚 Wikipedia Facts about {topic}")
@@ -318,7 +385,7 @@ def display_wiki_facts(topic, count=3, use_expanders=True):
 # Topic selection
 topic = st.sidebar.selectbox(
     "Recent topics",
-    options=st.session_state.user_topics,
+    options=state.user_topics,
     index=0
 )
 
@@ -330,11 +397,21 @@ if use_custom_topic:
     if custom_topic:
         topic = custom_topic
         # Add the custom topic to session state if it's not already there
-        if custom_topic not in st.session_state.user_topics:
-            if len(st.session_state.user_topics) == 0:
-                st.session_state.user_topics = [custom_topic]
+        if custom_topic not in state.user_topics:
+            if len(state.user_topics) == 0:
+                state.user_topics = [custom_topic]
             else:
-                st.session_state.user_topics.append(custom_topic)
+                state.user_topics.append(custom_topic)
+
+# Warm the caches for the selected topic in the background, so by the time
+# the user clicks "Show tweet" the headline and fact fetches are already
+# done (both handlers persist results to their caches and Supabase)
+if topic and topic != state.prefetched_topic:
+    state.prefetched_topic = topic
+    _prefetch_news = get_news_handler()
+    _prefetch_wiki = get_wiki_fetcher()
+    get_executor().submit(_prefetch_news.get_top_headlines, query=topic, count=5)
+    get_executor().submit(_prefetch_wiki.get_wiki_facts, query=topic, count=3)
 
 # Latest News enhanced button
 tweet_news = st.sidebar.checkbox("Latest News enhanced", value=st.session_state.tweet_news, key='tweet_news')
@@ -366,26 +443,26 @@ if document_enhanced:
     )
     
     # Process the uploaded document
-    if uploaded_file is not None and not st.session_state.document_uploaded:
+    if uploaded_file is not None and not state.document_uploaded:
         with st.spinner("Processing document..."):
             # Process document
-            document_id, text_chunks = document_handler.process_document(uploaded_file)
+            document_id, text_chunks = get_document_handler().process_document(uploaded_file)
             
             if text_chunks:
                 # Store in session state
-                st.session_state.document_chunks = text_chunks
-                st.session_state.document_id = document_id
-                st.session_state.document_uploaded = True
-                st.session_state.document_name = uploaded_file.name
+                state.document_chunks = text_chunks
+                state.document_id = document_id
+                state.document_uploaded = True
+                state.document_name = uploaded_file.name
                 
                 st.sidebar.success(f"Document '{uploaded_file.name}' processed successfully!")
             else:
                 st.sidebar.error("Could not extract text from the document")
-                st.session_state.document_uploaded = False
+                state.document_uploaded = False
     
     # Show document info if already uploaded
-    if st.session_state.document_uploaded:
-        st.sidebar.success(f"Using document: {st.session_state.document_name}")
+    if state.document_uploaded:
+        st.sidebar.success(f"Using document: {state.document_name}")
     
 # Show tweet button
 show_tweet = st.sidebar.button("Show tweet", on_click=on_show_tweet_click)
@@ -395,21 +472,21 @@ post_tweet = st.sidebar.button("Post Tweet", on_click=on_tweet_post_click)
 
 
 # Replace your current conditional UI with this:
-if st.session_state.scheduler_active:
+if state.scheduler_active:
     # Display active scheduler status with time remaining
     st.sidebar.subheader("Tweet Scheduler Active")
     
-    if st.session_state.next_tweet_time:
-        time_remaining = format_time_remaining(st.session_state.next_tweet_time)
-        st.sidebar.info(f"Next tweet in: {time_remaining}")
+    if state.next_tweet_time:
+        with st.sidebar:
+            render_countdown(state.next_tweet_time)
     
     # Add a button to stop the scheduler
     st.sidebar.button("Stop Scheduler", on_click=on_stop_scheduler_click)
     
-elif st.session_state.scheduling_mode:
+elif state.scheduling_mode:
     # We're in scheduling mode, show the slider and Start Tweet Scheduler button
     st.sidebar.subheader("Schedule Settings")
-    st.session_state.hours_to_schedule = st.sidebar.slider(
+    state.hours_to_schedule = st.sidebar.slider(
         "Post tweets every X hours:", 
         min_value=1, 
         max_value=24, 
@@ -435,93 +512,113 @@ if show_tweet:
         st.header("📄 Document Enhanced Mode")
     
         # Check if document has been uploaded
-        if not st.session_state.document_uploaded:
+        if not state.document_uploaded:
             st.info("Please upload a document to generate tweets")
             st.image("https://cdn-icons-png.flaticon.com/512/4208/4208479.png", width=100)
         else:
-            st.info(f"Using document: '{st.session_state.document_name}'")
+            st.info(f"Using document: '{state.document_name}'")
         
         # Generate the tweet
-        if st.session_state.document_uploaded:
-            with st.spinner("Generating tweet..."):
-                tweet_text = tweet_generator.generate_tweet_with_document(
-                    topic,
-                    document_handler.get_document_context(st.session_state.document_id)
-                )
-                st.session_state.current_tweet = tweet_text
-                st.session_state.current_topic = topic
-                st.session_state.include_news = False
-                st.session_state.include_wiki = False
+        if state.document_uploaded:
+            # Regenerate only when the generation inputs changed; unrelated
+            # reruns reuse the memoized tweet instead of another LLM call
+            key = ("document", topic, state.document_id)
+            if state.tweet_cache_key != key:
+                with st.spinner("Generating tweet..."):
+                    tweet_text = get_tweet_generator().generate_tweet_with_document(
+                        topic,
+                        get_document_handler().get_document_context(state.document_id)
+                    )
+                state.current_tweet = tweet_text
+                state.current_topic = topic
+                state.include_news = False
+                state.include_wiki = False
+                state.tweet_cache_key = key
+            else:
+                tweet_text = state.current_tweet
 
             st.subheader("The below tweet will be posted:")
             
             # Display the tweet
-            st.markdown(f"""
-            <div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; border-radius: 12px; padding: 20px; font-family: sans-serif; color: #000000;">
-            {tweet_text}
-            </div>
-            """, unsafe_allow_html=True)
+            render_tweet_card(tweet_text)
 
     if wiki_facts and tweet_news:
         st.header("📰 News and Wikipedia Facts Enhanced Mode")
         st.info("The agent will create tweets based on the latest news headlines and include interesting facts from Wikipedia.")
 
-        # Generate the tweet
-        with st.spinner("Generating tweet..."):
-            tweet_text = tweet_generator.generate_tweet_with_contexts(
-                topic,
-                include_news=True,
-                include_wiki=True,
-                news_handler=news_handler,
-                wiki_fetcher=wiki_fetcher
-            )
-            st.session_state.current_tweet = tweet_text
-            st.session_state.current_topic = topic
-            st.session_state.include_news = True
-            st.session_state.include_wiki = True
+        # Headlines and facts are independent network calls; fetch them
+        # concurrently so the wait is the slower of the two, not their sum.
+        # Both land in the handlers' caches, so the expanders below and the
+        # context fetch inside the generator reuse them
+        with st.spinner(f"Fetching news and facts about {topic}..."):
+            executor = get_executor()
+            news_future = executor.submit(get_news_handler().get_top_headlines, query=topic, count=5)
+            wiki_future = executor.submit(get_wiki_fetcher().get_wiki_facts, query=topic, count=3)
+            articles = news_future.result()
+            facts = wiki_future.result()
+
+        # Regenerate only when the generation inputs changed; unrelated
+        # reruns reuse the memoized tweet instead of another LLM call
+        key = (topic, True, True)
+        if state.tweet_cache_key != key:
+            with st.spinner("Generating tweet..."):
+                tweet_text = render_streaming_tweet(get_tweet_generator().stream_tweet_with_contexts(
+                    topic,
+                    include_news=True,
+                    include_wiki=True,
+                    news_handler=get_news_handler(),
+                    wiki_fetcher=get_wiki_fetcher(),
+                    news_articles=articles,
+                    wiki_facts=facts
+                ), topic)
+            state.current_tweet = tweet_text
+            state.current_topic = topic
+            state.include_news = True
+            state.include_wiki = True
+            state.tweet_cache_key = key
+        else:
+            tweet_text = state.current_tweet
 
         st.subheader("The below tweet will be posted:")
         
         # Display the tweet
-        st.markdown(f"""
-        <div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; border-radius: 12px; padding: 20px; font-family: sans-serif; color: #000000;">
-        {tweet_text}
-        </div>
-        """, unsafe_allow_html=True)
+        render_tweet_card(tweet_text)
 
         with st.expander("News articles"):
-            display_detailed_news(topic)
+            display_detailed_news(topic, articles=articles)
             
         with st.expander("Wikipedia Facts"):
-            display_wiki_facts(topic, use_expanders=False)
+            display_wiki_facts(topic, use_expanders=False, facts=facts)
 
     # Display different content based on checkbox selections
     elif tweet_news:
         st.header("📰 News Enhanced Mode")
         st.info("The agent will create tweets based on the latest news headlines for the selected topic.")
         
-        # Generate the tweet
-        with st.spinner("Generating tweet..."):
-            tweet_text = tweet_generator.generate_tweet_with_contexts(
-                topic,
-                include_news=True,
-                include_wiki=False,
-                news_handler=news_handler,
-                wiki_fetcher=None
-            )
-            st.session_state.current_tweet = tweet_text
-            st.session_state.current_topic = topic
-            st.session_state.include_news = True
-            st.session_state.include_wiki = False
+        # Regenerate only when the generation inputs changed; unrelated
+        # reruns reuse the memoized tweet instead of another LLM call
+        key = (topic, True, False)
+        if state.tweet_cache_key != key:
+            with st.spinner("Generating tweet..."):
+                tweet_text = render_streaming_tweet(get_tweet_generator().stream_tweet_with_contexts(
+                    topic,
+                    include_news=True,
+                    include_wiki=False,
+                    news_handler=get_news_handler(),
+                    wiki_fetcher=None
+                ), topic)
+            state.current_tweet = tweet_text
+            state.current_topic = topic
+            state.include_news = True
+            state.include_wiki = False
+            state.tweet_cache_key = key
+        else:
+            tweet_text = state.current_tweet
 
         st.subheader("The below tweet will be posted:")
         
         # Display the tweet
-        st.markdown(f"""
-        <div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; border-radius: 12px; padding: 20px; font-family: sans-serif; color: #000000;">
-        {tweet_text}
-        </div>
-        """, unsafe_allow_html=True)
+        render_tweet_card(tweet_text)
         
         with st.expander("Source"):
             display_detailed_news(topic)
@@ -530,28 +627,30 @@ if show_tweet:
         st.header("📚 Wikipedia Facts Enhanced Mode")
         st.info("The agent will include interesting facts from Wikipedia in the tweets.")
         
-        # Generate the tweet
-        with st.spinner("Generating tweet..."):
-            tweet_text = tweet_generator.generate_tweet_with_contexts(
-                topic,
-                include_news=False,
-                include_wiki=True,
-                news_handler=None,
-                wiki_fetcher=wiki_fetcher
-            )
-            st.session_state.current_tweet = tweet_text
-            st.session_state.current_topic = topic
-            st.session_state.include_news = False
-            st.session_state.include_wiki = True
+        # Regenerate only when the generation inputs changed; unrelated
+        # reruns reuse the memoized tweet instead of another LLM call
+        key = (topic, False, True)
+        if state.tweet_cache_key != key:
+            with st.spinner("Generating tweet..."):
+                tweet_text = render_streaming_tweet(get_tweet_generator().stream_tweet_with_contexts(
+                    topic,
+                    include_news=False,
+                    include_wiki=True,
+                    news_handler=None,
+                    wiki_fetcher=get_wiki_fetcher()
+                ), topic)
+            state.current_tweet = tweet_text
+            state.current_topic = topic
+            state.include_news = False
+            state.include_wiki = True
+            state.tweet_cache_key = key
+        else:
+            tweet_text = state.current_tweet
 
         st.subheader("The below tweet will be posted:")
         
         # Display the tweet
-        st.markdown(f"""
-        <div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; border-radius: 12px; padding: 20px; font-family: sans-serif; color: #000000;">
-        {tweet_text}
-        </div>
-        """, unsafe_allow_html=True)
+        render_tweet_card(tweet_text)
         
         with st.expander("Source"):
             display_wiki_facts(topic, use_expanders=False)
@@ -560,28 +659,30 @@ if show_tweet:
         st.header("📰 Default Mode")
         st.info("The agent will create a tweet based on the topic you've selected without additional context.")
         
-        # Generate the tweet
-        with st.spinner("Generating tweet..."):
-            tweet_text = tweet_generator.generate_tweet_with_contexts(
-                topic,
-                include_news=False,
-                include_wiki=False,
-                news_handler=None,
-                wiki_fetcher=None
-            )
-            st.session_state.current_tweet = tweet_text
-            st.session_state.current_topic = topic
-            st.session_state.include_news = False
-            st.session_state.include_wiki = False
+        # Regenerate only when the generation inputs changed; unrelated
+        # reruns reuse the memoized tweet instead of another LLM call
+        key = (topic, False, False)
+        if state.tweet_cache_key != key:
+            with st.spinner("Generating tweet..."):
+                tweet_text = render_streaming_tweet(get_tweet_generator().stream_tweet_with_contexts(
+                    topic,
+                    include_news=False,
+                    include_wiki=False,
+                    news_handler=None,
+                    wiki_fetcher=None
+                ), topic)
+            state.current_tweet = tweet_text
+            state.current_topic = topic
+            state.include_news = False
+            state.include_wiki = False
+            state.tweet_cache_key = key
+        else:
+            tweet_text = state.current_tweet
 
         st.subheader("The below tweet will be posted:")
         
         # Display the tweet
-        st.markdown(f"""
-        <div style="background-color: #f8f9fa; border: 1px solid #e1e8ed; border-radius: 12px; padding: 20px; font-family: sans-serif; color: #000000;">
-        {tweet_text}
-        </div>
-        """, unsafe_allow_html=True)
+        render_tweet_card(tweet_text)
 
 # Footer
 st.sidebar.markdown("---")
@@ -591,14 +692,6 @@ st.sidebar.info(
 )
 st.sidebar.markdown("© 2025 Twitter Posting Agent - Design by Aranya Ray")
 
-# Add auto-refresh for the timer near the top of your file
-if st.session_state.scheduler_active and st.session_state.next_tweet_time:
-    st.write(
-        """
-        <meta http-equiv="refresh" content="10">
-        """,
-        unsafe_allow_html=True
-    )
 
 
 
@@ -1,26 +1,64 @@
 import os
+import re
+import time
+import random
+import hashlib
+import itertools
 from dotenv import load_dotenv
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from langchain_community.tools import WikipediaQueryRun
 from langchain_community.utilities import WikipediaAPIWrapper
 from supabase import create_client
 
 load_dotenv()
 
+# How long in-process fact results stay valid (seconds)
+FACT_CACHE_TTL = 300
+
+# Columns the app actually consumes from the wiki_facts table
+FACT_COLUMNS = 'content,topic,source,url,collected_at'
+
 class WikiFetcher:
-    def __init__(self):
-        # Initialize Wikipedia API wrapper
-        self.wikipedia = WikipediaAPIWrapper(top_k_results=10)
-        self.wikipedia_tool = WikipediaQueryRun(api_wrapper=self.wikipedia)
-        
-        # Initialize Supabase client
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
+    def __init__(self, supabase=None, wiki_tool=None):
+        """Initialize the Wikipedia tool and Supabase client.
+
+        Both clients can be injected so callers can share single cached
+        instances across handlers instead of rebuilding them here.
+
+        The cache lookups assume the indexes from sql/wiki_facts_indexes.sql
+        exist on the wiki_facts table; without them every freshness query
+        degrades to a sequential scan.
+
+        Args:
+            supabase: An existing Supabase client to reuse
+            wiki_tool: An existing WikipediaQueryRun tool to reuse
+        """
+        # Initialize Wikipedia API wrapper unless a tool was injected.
+        # Two pages capped at 4000 chars yield plenty of usable paragraphs;
+        # the old ten-full-page fetch downloaded far more than
+        # _process_wiki_results ever kept
+        if wiki_tool is None:
+            wiki_tool = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper(
+                top_k_results=2, doc_content_chars_max=4000
+            ))
+
+        self.wikipedia = wiki_tool.api_wrapper
+        self.wikipedia_tool = wiki_tool
         
-        if not supabase_url or not supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in your .env file")
-            
-        self.supabase = create_client(supabase_url, supabase_key)
+        # Initialize Supabase client unless one was injected
+        if supabase is None:
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_KEY")
+
+            if not supabase_url or not supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in your .env file")
+
+            supabase = create_client(supabase_url, supabase_key)
+
+        self.supabase = supabase
+
+        # In-process cache: (query, count) -> (monotonic timestamp, facts)
+        self._mem_cache = {}
         
     def get_wiki_facts(self, query, count=10, save_to_db=True, max_age_hours=168):  # Default 7 days cache
         """
@@ -34,57 +72,45 @@ class WikiFetcher:
             max_age_hours: Maximum age of cached facts in hours
         """
         try:
-            # Check if we have recent facts in Supabase first
-            stored_facts = self.fetch_stored_facts(query=query, limit=count)
-            
-            # Check if facts are recent enough
-            current_time = datetime.now(timezone.utc)
-            recent_facts = []
-            
-            for fact in stored_facts:
-                try:
-                    # Parse the timestamp from collected_at field
-                    if 'collected_at' in fact:
-                        # If collected_at is already a datetime object
-                        if isinstance(fact['collected_at'], datetime):
-                            fact_time = fact['collected_at']
-                            if fact_time.tzinfo is None:
-                                # Add timezone if naive
-                                fact_time = fact_time.replace(tzinfo=timezone.utc)
-                        # If it's a string, parse it
-                        else:
-                            fact_time = datetime.fromisoformat(fact['collected_at'].replace('Z', '+00:00'))
-                        
-                        age_hours = (current_time - fact_time).total_seconds() / 3600
-                        
-                        if age_hours <= max_age_hours:
-                            recent_facts.append(fact)
-                except (ValueError, KeyError) as e:
-                    print(f"Error parsing timestamp for fact: {e}")
-                    continue
+            # Serve repeated requests for the same (query, count) from memory
+            # instead of hitting Supabase on every Streamlit rerun
+            cache_key = (query, count)
+            cached = self._mem_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < FACT_CACHE_TTL:
+                return cached[1]
+            # Check if we have recent facts in Supabase first; the freshness
+            # filter runs server-side so stale rows never leave the database
+            recent_facts = self.fetch_stored_facts(
+                query=query, limit=count, max_age_hours=max_age_hours
+            )
             
             # If we have enough recent stored facts, return those
             if len(recent_facts) >= count:
                 print(f"Using {len(recent_facts)} cached facts from Supabase (less than {max_age_hours} hours old)")
+                self._mem_cache[cache_key] = (time.monotonic(), recent_facts)
                 return recent_facts
             
-            # Otherwise, fetch new facts from Wikipedia API
-            print(f"No recent cached facts found for '{query}', fetching from Wikipedia")
-            
+            # Otherwise, top up from the Wikipedia API — but only build the
+            # facts the cache couldn't supply
+            needed = count - len(recent_facts)
+            print(f"Found {len(recent_facts)} recent cached facts for '{query}', fetching {needed} from Wikipedia")
+
             # Use LangChain's Wikipedia tool to fetch information
             wiki_result = self.wikipedia_tool.invoke(query)
-            
+
             if wiki_result:
                 # Process wiki results into digestible facts
-                processed_facts = self._process_wiki_results(wiki_result, query, count)
-                
+                processed_facts = self._process_wiki_results(wiki_result, query, needed)
+
                 if save_to_db and processed_facts:
                     self._save_facts_to_supabase(processed_facts, query)
-                
-                return processed_facts
+
+                facts = (recent_facts + processed_facts)[:count]
+                self._mem_cache[cache_key] = (time.monotonic(), facts)
+                return facts
             else:
                 print(f"No Wikipedia information found for '{query}'")
-                return []
+                return recent_facts
                 
         except Exception as e:
             print(f"Error fetching Wikipedia facts: {str(e)}")
@@ -95,62 +121,82 @@ class WikiFetcher:
         Process Wikipedia results into digestible facts.
         """
         try:
-            # Split the text into paragraphs
-            paragraphs = wiki_text.split("\n\n")
-            
-            # Filter out empty paragraphs and those that are too short
-            paragraphs = [p for p in paragraphs if len(p) > 50]
-            
-            facts = []
-            for i, paragraph in enumerate(paragraphs):
-                if i >= count:
-                    break
-                    
-                # Create a fact dictionary
-                fact = {
-                    'content': paragraph.strip(),
-                    'topic': query,
-                    'source': 'Wikipedia',
-                    'url': f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}",
-                }
-                
-                facts.append(fact)
-                
-            return facts
+            # The article URL is the same for every fact; build it once
+            wiki_url = f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}"
+
+            # Lazily split into paragraphs and stop scanning once count
+            # usable ones are found, instead of materializing every
+            # paragraph of a potentially large multi-page response
+            paragraphs = (p.strip() for p in re.split(r'\n\n+', wiki_text) if len(p) > 50)
+            selected = itertools.islice(paragraphs, count)
+
+            return [{
+                'content': paragraph,
+                'topic': query,
+                'source': 'Wikipedia',
+                'url': wiki_url,
+            } for paragraph in selected]
         except Exception as e:
             print(f"Error processing Wikipedia results: {str(e)}")
             return []
             
     def _save_facts_to_supabase(self, facts, query):
-        """Save facts to Supabase."""
+        """Save facts to Supabase in a single bulk upsert."""
         current_time = datetime.now(timezone.utc).isoformat()
+
+        # The conflict target hashes content because Postgres can only infer
+        # an ON CONFLICT arbiter from a unique index on plain columns, and a
+        # unique index on full paragraphs would blow the B-tree row limit
+        rows = [{
+            'content': fact['content'],
+            'content_md5': hashlib.md5(fact['content'].encode()).hexdigest(),
+            'topic': query,
+            'source': fact['source'],
+            'url': fact['url'],
+            'collected_at': current_time
+        } for fact in facts]
+
+        try:
+            # One round-trip for the whole batch; the conflict target keeps
+            # refetches of the same article from duplicating rows
+            self.supabase.table('wiki_facts').upsert(
+                rows, on_conflict='topic,content_md5'
+            ).execute()
+        except Exception as e:
+            print(f"Error saving facts to Supabase: {str(e)}")
+            return
+
+        try:
+            # Trim the topic's history so the table stays bounded as facts
+            # accumulate (function defined in sql/prune_wiki_facts.sql)
+            self.supabase.rpc('prune_wiki_facts', {'p_topic': query, 'p_keep': 50}).execute()
+        except Exception as e:
+            print(f"Error pruning wiki facts: {str(e)}")
         
-        for fact in facts:
-            try:
-                self.supabase.table('wiki_facts').insert({
-                    'content': fact['content'],
-                    'topic': query,
-                    'source': fact['source'],
-                    'url': fact['url'],
-                    'collected_at': current_time
-                }).execute()
-            except Exception as e:
-                print(f"Error saving fact to Supabase: {str(e)}")
-        
-    def fetch_stored_facts(self, query=None, limit=10):
-        """Fetch facts from Supabase."""
+    def fetch_stored_facts(self, query=None, limit=10, max_age_hours=None, columns=FACT_COLUMNS):
+        """Fetch facts from Supabase, newest first.
+
+        When max_age_hours is given, the freshness predicate is pushed into
+        the query so Supabase filters on its index instead of shipping stale
+        rows to the client. Only the requested columns cross the wire.
+        """
         try:
+            request = self.supabase.table('wiki_facts').select(columns)
+
             if query:
-                response = self.supabase.table('wiki_facts').select('*').eq('topic', query).limit(limit).execute()
-            else:
-                response = self.supabase.table('wiki_facts').select('*').limit(limit).execute()
-            
+                request = request.eq('topic', query)
+
+            if max_age_hours is not None:
+                cutoff = (datetime.now(timezone.utc) - timedelta(hours=max_age_hours)).isoformat()
+                request = request.gte('collected_at', cutoff)
+
+            response = request.order('collected_at', desc=True).limit(limit).execute()
             return response.data
         except Exception as e:
             print(f"Error fetching stored facts: {str(e)}")
             return []
 
-    def get_wiki_context(self, query, count=10, max_length=500):
+    def get_wiki_context(self, query, count=10, max_length=500, facts=None):
         """
         Get Wikipedia facts formatted as context for LLMs.
         
@@ -158,13 +204,17 @@ class WikiFetcher:
             query: The search query for Wikipedia
             count: Number of facts to return (will fetch this many but only return one random fact)
             max_length: Maximum length of each fact in characters
+            facts: Pre-fetched facts to format, skipping the fetch
             
         Returns:
             String: Formatted context for LLM consumption with a single random fact
         """
         try:
-            # Fetch facts first (using cached if available)
-            facts = self.get_wiki_facts(query=query, count=count)
+            # Fetch facts unless the caller already has them. Only one fact
+            # ends up in the context, so a handful is plenty of variety and
+            # costs a fraction of the default ten-row payload
+            if facts is None:
+                facts = self.get_wiki_facts(query=query, count=min(count, 3))
             
             if not facts:
                 return f"I couldn't find any Wikipedia information about {query}."
@@ -173,7 +223,6 @@ class WikiFetcher:
             context = f"Wikipedia Information about {query}:\n\n"
             
             # Select a random fact from the available ones
-            import random
             random_fact = random.choice(facts)
             
             # Get content and truncate if necessary
@@ -186,7 +235,7 @@ class WikiFetcher:
             
             # Add source and URL
             source = random_fact.get('source', 'Wikipedia')
-            url = random_fact.get('url', f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}")
+            url = random_fact.get('url') or f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}"
             context += f"Source: {source} | URL: {url}\n\n"
             
             return context